@@ -2,22 +2,62 @@ import os
 import re
 import json
 import time
+import tomllib
 import html
+import io
+import functools
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
+import ahocorasick
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser
 import yagmail
-import yaml
 
 UA = (
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
     "(KHTML, like Gecko) Chrome/119.0 Safari/537.36"
 )
 TIMEOUT = 15
+LONDON_TZ = ZoneInfo("Europe/London")
+
+# location / organisation inference from listing context
+_UK_PLACES = r"London|Oxford|Cambridge|Manchester|Edinburgh|Glasgow|Bristol|Leeds|Birmingham|Sheffield|UK|United Kingdom"
+LOC_RE = re.compile(rf"({_UK_PLACES})", re.I)
+LOC_OR_REMOTE_RE = re.compile(rf"({_UK_PLACES}|Remote)", re.I)
+INDUSTRY_LOC_RE = re.compile(r"(London|UK|United Kingdom|Remote)", re.I)
+ORG_RE = re.compile(r"(University|NHS|King’s College|King's College|Imperial|UCL|KCL|Oxford|Cambridge|Institute|Trust|Ltd|Limited|PLC|Biotech|Centre|Center)[^|,–-]*", re.I)
+INDUSTRY_ORG_RE = re.compile(r"(University|Institute|Ltd|Limited|PLC|Biotech|Research|Clinic|Centre|Center)[^|,–-]*", re.I)
+UK_RE = re.compile(
+    r"uk|united kingdom|england|scotland|wales|northern ireland|"
+    r"london|oxford|cambridge|manchester|edinburgh|glasgow|bristol|"
+    r"leeds|birmingham|sheffield"
+)
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w.:-]+)""", re.I)
+JOB_PATH_RE = re.compile(r"/job|vacanc|opportunit|careers|/positions|/recruit", re.I)
+
+# tags treated as the listing container around a job anchor
+CONTAINER_TAGS = frozenset({"article", "li", "div"})
+ROW_CONTAINER_TAGS = CONTAINER_TAGS | {"tr"}
+
+# one pooled session so repeated fetches to the same host reuse connections;
+# successful responses are cached on disk so same-day reruns skip the network
+SESSION = requests_cache.CachedSession(
+    "opp_finder_cache",
+    backend="sqlite",
+    expire_after=timedelta(hours=12),
+    allowable_codes=(200,),
+)
+SESSION.headers["User-Agent"] = UA
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=Retry(total=2, backoff_factor=0.3))
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
 
 # ------------------------- config -------------------------
 
@@ -34,12 +74,12 @@ class Config:
     sources: list[str]
     generic_sites: list[str]
 
-def load_config(path: str = "config.yaml") -> Config:
+def load_config(path: str = "config.toml") -> Config:
     if not os.path.exists(path):
-        raise RuntimeError("config.yaml not found. Please add it at repo root.")
+        raise RuntimeError("config.toml not found. Please add it at repo root.")
 
-    with open(path, "r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f) or {}
+    with open(path, "rb") as f:
+        cfg = tomllib.load(f)
 
     email_to = (cfg.get("email", {}) or {}).get("to") or None
     from_name = (cfg.get("email", {}) or {}).get("from_name") or "Weekly Opportunity Finder"
@@ -72,41 +112,99 @@ def load_config(path: str = "config.yaml") -> Config:
 
 # ------------------------- utils -------------------------
 
+def page_encoding(r: requests.Response) -> str:
+    """Charset from the Content-Type header, else from <meta charset>, else UTF-8."""
+    if "charset" in r.headers.get("Content-Type", "").lower() and r.encoding:
+        return r.encoding
+    m = META_CHARSET_RE.search(r.content[:4096])
+    return m.group(1).decode("ascii") if m else "utf-8"
+
+# successfully fetched pages for this run; failures are not stored so they get retried
+_PAGE_CACHE: dict[str, str] = {}
+
 def http_get(url: str) -> str | None:
+    page = _PAGE_CACHE.get(url)
+    if page is None:
+        page = _fetch_page(url)
+        if page is not None:
+            _PAGE_CACHE[url] = page
+    return page
+
+def _fetch_page(url: str) -> str | None:
+    # decoded here because lexbor treats raw bytes as UTF-8 regardless of the
+    # declared charset
     try:
-        r = requests.get(url, headers={"User-Agent": UA}, timeout=TIMEOUT)
+        r = SESSION.get(url, timeout=TIMEOUT)
         if r.status_code != 200:
             return None
-        return r.text
+        try:
+            return r.content.decode(page_encoding(r), "replace")
+        except LookupError:
+            return r.content.decode("utf-8", "replace")
     except requests.RequestException:
         return None
 
+def parse_html(html_text: str) -> LexborHTMLParser:
+    return LexborHTMLParser(html_text)
+
+def anchors_with_container(tree: LexborHTMLParser, container_tags=CONTAINER_TAGS):
+    """Yield (anchor, container) pairs; the anchor stands in when it has no container."""
+    for a in tree.css("a[href]"):
+        parent = a.parent
+        while parent is not None and parent.tag not in container_tags:
+            parent = parent.parent
+        yield a, (parent if parent is not None else a)
+
+def node_text(node) -> str:
+    # lexbor keeps whitespace-only text nodes as empty strings, so collapse runs
+    return " ".join(node.text(separator=" ").split())
+
+def keyword_queries(keywords: list[str], batch: int | None = None) -> list[str]:
+    """OR-join keywords into search queries of at most `batch` terms (one query if None)."""
+    terms = [f'"{k}"' if " " in k else k for k in keywords]
+    batch = batch or len(terms) or 1
+    return [" OR ".join(terms[i:i + batch]) for i in range(0, len(terms), batch)]
+
+def fetch_all(urls: list[str], workers: int = 8) -> list[str | None]:
+    """Fetch distinct-host URLs concurrently; results keep the order of `urls`."""
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as pool:
+        return list(pool.map(http_get, urls))
+
+@functools.lru_cache(maxsize=8)
+def _keyword_automaton(keywords: tuple[str, ...]) -> ahocorasick.Automaton:
+    ac = ahocorasick.Automaton()
+    for i, k in enumerate(keywords):
+        ac.add_word(k, (i, k))
+    ac.make_automaton()
+    return ac
+
 def text_matches_keywords(text: str, keywords: list[str]) -> list[str]:
-    t = text.lower()
-    return [k for k in keywords if k in t]
+    # single pass over the text for all keywords; result keeps config order
+    if not keywords:
+        return []
+    ac = _keyword_automaton(tuple(keywords))
+    return [k for _, k in sorted({hit for _, hit in ac.iter(text.lower())})]
 
+@functools.lru_cache(maxsize=1024)
 def looks_uk(location_text: str) -> bool:
-    t = (location_text or "").lower()
-    return any(x in t for x in [
-        "uk","united kingdom","england","scotland","wales","northern ireland",
-        "london","oxford","cambridge","manchester","edinburgh","glasgow","bristol",
-        "leeds","birmingham","sheffield"])
+    return UK_RE.search((location_text or "").lower()) is not None
 
 def london_bias_score(location_text: str) -> int:
     return 1 if ("london" in (location_text or "").lower()) else 0
 
 def dedupe(items, key=lambda x: x["link"]):
-    seen = set()
-    out = []
+    # insertion-ordered dict doubles as the seen-set; first occurrence wins
+    out = {}
     for it in items:
         k = key(it)
-        if k and k not in seen:
-            seen.add(k)
-            out.append(it)
-    return out
+        if k:
+            out.setdefault(k, it)
+    return list(out.values())
 
 def week_label_london(now_utc: datetime) -> str:
-    dt_ldn = now_utc.astimezone(ZoneInfo("Europe/London"))
+    dt_ldn = now_utc.astimezone(LONDON_TZ)
     monday = dt_ldn - timedelta(days=dt_ldn.weekday())
     return monday.strftime("Week of %d %b %Y")
 
@@ -128,60 +226,61 @@ class Item:
 def scrape_findaphd(cfg: Config) -> list[Item]:
     results: list[Item] = []
     base = "https://www.findaphd.com"
-    for kw in cfg.keywords:
-        q = urllib.parse.quote_plus(kw)
+    for query in keyword_queries(cfg.keywords, 3):
+        if len(results) >= cfg.per_site: break
+        q = urllib.parse.quote_plus(query)
         url = f"{base}/phds/united-kingdom/?Keywords={q}"
         html_text = http_get(url)
         if not html_text: continue
-        soup = BeautifulSoup(html_text, "html.parser")
-        cards = soup.select("article, .result, .search-result, .project-result, li") or soup.find_all("a")
+        tree = parse_html(html_text)
+        cards = tree.css("article, .result, .search-result, .project-result, li") or tree.css("a")
         for node in cards:
-            a = node.find("a") if hasattr(node, "find") else (node if getattr(node, "name", "")=="a" else None)
-            if not a: continue
-            href = a.get("href") or ""
+            if len(results) >= cfg.per_site: break
+            a = node if node.tag == "a" else node.css_first("a")
+            if a is None: continue
+            href = a.attributes.get("href") or ""
             if not href or "phds" not in href.lower(): continue
             link = href if href.startswith("http") else (base + href)
-            title = a.get_text(" ", strip=True) or ""
+            title = node_text(a)
             if len(title) < 6: continue
-            context_text = node.get_text(" ", strip=True) if hasattr(node,"get_text") else title
+            context_text = node_text(node)
             matched = text_matches_keywords(context_text + " " + title, cfg.keywords)
             if not matched: continue
-            m = re.search(r"(London|Oxford|Cambridge|Bristol|Manchester|Edinburgh|Glasgow|Birmingham|Leeds|UK|United Kingdom)", context_text, flags=re.I)
+            m = LOC_RE.search(context_text)
             loc = m.group(0) if m else "United Kingdom"
             if cfg.uk_only and not looks_uk(loc): continue
-            m2 = re.search(r"(University|King’s College|King's College|Imperial|UCL|KCL|Oxford|Cambridge)[^|,–-]*", context_text, flags=re.I)
+            m2 = ORG_RE.search(context_text)
             org = (m2.group(0).strip() if m2 else "FindAPhD listing")
             results.append(Item("FindAPhD", title, org, loc, "(see listing)", link, matched))
-            if len(results) >= cfg.per_site: break
         time.sleep(0.6)
     return results
 
 def scrape_jobs_ac_uk(cfg: Config) -> list[Item]:
     results: list[Item] = []
     base = "https://www.jobs.ac.uk"
-    for kw in cfg.keywords:
-        q = urllib.parse.quote_plus(kw)
+    for query in keyword_queries(cfg.keywords):
+        if len(results) >= cfg.per_site: break
+        q = urllib.parse.quote_plus(query)
         url = f"{base}/search/?keywords={q}&location=United%20Kingdom"
         html_text = http_get(url)
         if not html_text: continue
-        soup = BeautifulSoup(html_text, "html.parser")
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
+        tree = parse_html(html_text)
+        for a, parent in anchors_with_container(tree):
+            if len(results) >= cfg.per_site: break
+            href = a.attributes.get("href") or ""
             if "/job/" not in href: continue
             link = href if href.startswith("http") else (base + href)
-            title = a.get_text(" ", strip=True)
+            title = node_text(a)
             if not title or len(title) < 6: continue
-            parent = a.find_parent(["article","li","div"]) or a
-            context = parent.get_text(" ", strip=True)
+            context = node_text(parent)
             matched = text_matches_keywords((title + " " + context), cfg.keywords)
             if not matched: continue
-            m = re.search(r"(London|Oxford|Cambridge|Manchester|Edinburgh|Glasgow|Birmingham|Leeds|Bristol|UK|United Kingdom)", context, flags=re.I)
+            m = LOC_RE.search(context)
             loc = m.group(0) if m else "United Kingdom"
             if cfg.uk_only and not looks_uk(loc): continue
-            m2 = re.search(r"(University|NHS|King’s College|King's College|Imperial|UCL|KCL|Oxford|Cambridge|Institute|Trust)[^|,–-]*", context, flags=re.I)
+            m2 = ORG_RE.search(context)
             org = (m2.group(0).strip() if m2 else "jobs.ac.uk listing")
             results.append(Item("jobs.ac.uk", title, org, loc, "(see listing)", link, matched))
-            if len(results) >= cfg.per_site: break
         time.sleep(0.6)
     return results
 
@@ -189,28 +288,28 @@ def scrape_psychedelic_alpha(cfg: Config) -> list[Item]:
     results: list[Item] = []
     base = "https://jobs.psychedelicalpha.com"
     for kw in cfg.keywords:
+        if len(results) >= cfg.per_site: break
         q = urllib.parse.quote_plus(kw)
         url = f"{base}/jobs?search={q}"
         html_text = http_get(url)
         if not html_text: continue
-        soup = BeautifulSoup(html_text, "html.parser")
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
+        tree = parse_html(html_text)
+        for a, parent in anchors_with_container(tree):
+            if len(results) >= cfg.per_site: break
+            href = a.attributes.get("href") or ""
             if not href.startswith("/jobs"): continue
             link = href if href.startswith("http") else (base + href)
-            title = a.get_text(" ", strip=True)
+            title = node_text(a)
             if not title or len(title) < 5: continue
-            parent = a.find_parent(["article","li","div"]) or a
-            context = parent.get_text(" ", strip=True)
+            context = node_text(parent)
             matched = text_matches_keywords((title + " " + context), cfg.keywords)
             if not matched: continue
-            m = re.search(r"(London|UK|United Kingdom|Remote)", context, flags=re.I)
+            m = INDUSTRY_LOC_RE.search(context)
             loc = m.group(0) if m else ("United Kingdom" if "uk" in context.lower() else "Remote/Unknown")
             if cfg.uk_only and not looks_uk(loc): continue
-            m2 = re.search(r"(University|Institute|Ltd|Limited|PLC|Biotech|Research|Clinic|Centre|Center)[^|,–-]*", context, flags=re.I)
+            m2 = INDUSTRY_ORG_RE.search(context)
             org = (m2.group(0).strip() if m2 else "Psychedelic Alpha")
             results.append(Item("Psychedelic Alpha", title, org, loc, "(see listing)", link, matched))
-            if len(results) >= cfg.per_site: break
         time.sleep(0.6)
     return results
 
@@ -222,30 +321,30 @@ def scrape_nature_careers(cfg: Config) -> list[Item]:
     """
     results: list[Item] = []
     base = "https://jobs.nature.com"
-    for kw in cfg.keywords:
-        q = urllib.parse.quote_plus(kw)
+    for query in keyword_queries(cfg.keywords):
+        if len(results) >= cfg.per_site: break
+        q = urllib.parse.quote_plus(query)
         url = f"{base}/jobs/united-kingdom/?keywords={q}"
         html_text = http_get(url)
         if not html_text: continue
-        soup = BeautifulSoup(html_text, "html.parser")
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
+        tree = parse_html(html_text)
+        for a, parent in anchors_with_container(tree):
+            if len(results) >= cfg.per_site: break
+            href = a.attributes.get("href") or ""
             if not (href.startswith("/job/") or "/job/" in href): continue
             link = href if href.startswith("http") else (base + href)
-            title = a.get_text(" ", strip=True)
+            title = node_text(a)
             if not title or len(title) < 5: continue
-            parent = a.find_parent(["article","li","div"]) or a
-            context = parent.get_text(" ", strip=True)
+            context = node_text(parent)
             matched = text_matches_keywords(title + " " + context, cfg.keywords)
             if not matched: continue
             # infer org/location
-            mloc = re.search(r"(London|Oxford|Cambridge|Manchester|Edinburgh|Glasgow|Bristol|Leeds|UK|United Kingdom)", context, flags=re.I)
+            mloc = LOC_RE.search(context)
             loc = mloc.group(0) if mloc else "United Kingdom"
             if cfg.uk_only and not looks_uk(loc): continue
-            morg = re.search(r"(University|Institute|King’s College|King's College|Imperial|UCL|KCL|Oxford|Cambridge|NHS|Trust|Ltd|Limited|Biotech)[^|,–-]*", context, flags=re.I)
+            morg = ORG_RE.search(context)
             org = (morg.group(0).strip() if morg else "Nature Careers")
             results.append(Item("Nature Careers", title, org, loc, "(see listing)", link, matched))
-            if len(results) >= cfg.per_site: break
         time.sleep(0.6)
     return results
 
@@ -256,28 +355,28 @@ def scrape_euraxess(cfg: Config) -> list[Item]:
     results: list[Item] = []
     base = "https://euraxess.ec.europa.eu"
     for kw in cfg.keywords:
+        if len(results) >= cfg.per_site: break
         q = urllib.parse.quote_plus(kw)
         url = f"{base}/jobs/search?keywords={q}&f%5B0%5D=country%3AUnited%20Kingdom"
         html_text = http_get(url)
         if not html_text: continue
-        soup = BeautifulSoup(html_text, "html.parser")
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
+        tree = parse_html(html_text)
+        for a, parent in anchors_with_container(tree):
+            if len(results) >= cfg.per_site: break
+            href = a.attributes.get("href") or ""
             if "/jobs/" not in href: continue
             link = href if href.startswith("http") else (base + href)
-            title = a.get_text(" ", strip=True)
+            title = node_text(a)
             if not title or len(title) < 6: continue
-            parent = a.find_parent(["article","li","div"]) or a
-            context = parent.get_text(" ", strip=True)
+            context = node_text(parent)
             matched = text_matches_keywords(title + " " + context, cfg.keywords)
             if not matched: continue
-            mloc = re.search(r"(London|Oxford|Cambridge|Manchester|Edinburgh|Glasgow|Bristol|Leeds|UK|United Kingdom)", context, flags=re.I)
+            mloc = LOC_RE.search(context)
             loc = mloc.group(0) if mloc else "United Kingdom"
             if cfg.uk_only and not looks_uk(loc): continue
-            morg = re.search(r"(University|Institute|King’s College|King's College|Imperial|UCL|KCL|Oxford|Cambridge|NHS|Trust|Ltd|Limited|Biotech)[^|,–-]*", context, flags=re.I)
+            morg = ORG_RE.search(context)
             org = (morg.group(0).strip() if morg else "EURAXESS")
             results.append(Item("EURAXESS", title, org, loc, "(see listing)", link, matched))
-            if len(results) >= cfg.per_site: break
         time.sleep(0.6)
     return results
 
@@ -289,61 +388,68 @@ def scrape_generic_sites(cfg: Config) -> list[Item]:
     and filter by keywords + UK.
     """
     results: list[Item] = []
-    for site in cfg.generic_sites:
-        html_text = http_get(site)
+    # every site is a different host, so there is no need to pace these
+    pages = fetch_all(cfg.generic_sites)
+    for site, html_text in zip(cfg.generic_sites, pages):
         if not html_text: continue
-        soup = BeautifulSoup(html_text, "html.parser")
+        tree = parse_html(html_text)
         base = "{uri.scheme}://{uri.netloc}".format(uri=urllib.parse.urlparse(site))
 
-        anchors = soup.find_all("a", href=True)
         count = 0
-        for a in anchors:
-            href = a["href"].strip()
-            text = a.get_text(" ", strip=True)
-            if len(text) < 5: continue
+        for a, parent in anchors_with_container(tree, ROW_CONTAINER_TAGS):
+            if count >= cfg.per_site: break
+            href = (a.attributes.get("href") or "").strip()
             # heuristics: look for typical job-ish paths/words
-            if not any(s in href.lower() for s in ["/job", "vacanc", "opportunit", "careers", "/positions", "/recruit", "/jobs"]):
+            if not JOB_PATH_RE.search(href):
                 continue
+            text = node_text(a)
+            if len(text) < 5: continue
 
             link = href if href.startswith("http") else urllib.parse.urljoin(base, href)
-            parent = a.find_parent(["article","li","div","tr"]) or a
-            context = parent.get_text(" ", strip=True)
+            context = node_text(parent)
             matched = text_matches_keywords((text + " " + context), cfg.keywords)
             if not matched: continue
 
             # org/location inference
             org_guess = urllib.parse.urlparse(site).netloc
-            mloc = re.search(r"(London|Oxford|Cambridge|Manchester|Edinburgh|Glasgow|Bristol|Leeds|UK|United Kingdom|Remote)", context, flags=re.I)
+            mloc = LOC_OR_REMOTE_RE.search(context)
             loc = mloc.group(0) if mloc else ("United Kingdom" if "uk" in context.lower() or ".ac.uk" in org_guess else "Unknown/Remote")
             if cfg.uk_only and not looks_uk(loc): continue
 
             results.append(Item("Generic", text, org_guess, loc, "(see listing)", link, matched))
             count += 1
-            if count >= cfg.per_site:
-                break
-        time.sleep(0.6)
     return results
 
 # ------------------------- aggregator -------------------------
 
+def result_sort_key(it: Item) -> tuple[int, int, str]:
+    # London first, then most keywords matched, then source name
+    return (-london_bias_score(it.location), -len(it.matched_keywords), it.source)
+
+SCRAPERS = [
+    ("findaphd", scrape_findaphd),
+    ("jobs_ac_uk", scrape_jobs_ac_uk),
+    ("psychedelic_alpha", scrape_psychedelic_alpha),
+    ("nature_careers", scrape_nature_careers),
+    ("euraxess", scrape_euraxess),
+    ("generic_sites", scrape_generic_sites),
+]
+
 def gather_results(cfg: Config) -> list[Item]:
-    items: list[Item] = []
+    enabled = [fn for name, fn in SCRAPERS if name in cfg.sources]
+    if not cfg.generic_sites and scrape_generic_sites in enabled:
+        enabled.remove(scrape_generic_sites)
 
-    if "findaphd" in cfg.sources:
-        items.extend(scrape_findaphd(cfg))
-    if "jobs_ac_uk" in cfg.sources:
-        items.extend(scrape_jobs_ac_uk(cfg))
-    if "psychedelic_alpha" in cfg.sources:
-        items.extend(scrape_psychedelic_alpha(cfg))
-    if "nature_careers" in cfg.sources:
-        items.extend(scrape_nature_careers(cfg))
-    if "euraxess" in cfg.sources:
-        items.extend(scrape_euraxess(cfg))
-    if "generic_sites" in cfg.sources and cfg.generic_sites:
-        items.extend(scrape_generic_sites(cfg))
+    # each scraper talks to its own host and paces itself (time.sleep between
+    # keyword fetches), so running them side by side stays polite per host
+    items: list[Item] = []
+    if enabled:
+        with ThreadPoolExecutor(max_workers=len(enabled)) as pool:
+            for found in pool.map(lambda fn: fn(cfg), enabled):
+                items.extend(found)
 
     items = dedupe(items, key=lambda it: it.link)
-    items.sort(key=lambda it: (-london_bias_score(it.location), -len(it.matched_keywords), it.source))
+    items.sort(key=result_sort_key)
     if cfg.total and len(items) > cfg.total:
         items = items[: cfg.total]
     return items
@@ -351,7 +457,11 @@ def gather_results(cfg: Config) -> list[Item]:
 # ------------------------- email rendering -------------------------
 
 def build_quick_links(cfg: Config):
-    kws = "+".join(urllib.parse.quote_plus(k) for k in cfg.keywords[:4])
+    return _quick_links(tuple(cfg.keywords[:4]))
+
+@functools.lru_cache(maxsize=4)
+def _quick_links(keywords: tuple[str, ...]) -> tuple[tuple[str, str], ...]:
+    kws = "+".join(urllib.parse.quote_plus(k) for k in keywords)
     links = []
     links.append(("FindAPhD (UK) – keywords", f"https://www.findaphd.com/phds/united-kingdom/?Keywords={kws}"))
     links.append(("jobs.ac.uk (UK) – keywords", f"https://www.jobs.ac.uk/search/?keywords={kws}&location=United%20Kingdom"))
@@ -360,43 +470,54 @@ def build_quick_links(cfg: Config):
     links.append(("Psychedelic Alpha – keywords", f"https://jobs.psychedelicalpha.com/jobs?search={kws}"))
     links.append(("LinkedIn Jobs (UK) – keywords", f"https://www.linkedin.com/jobs/search/?keywords={kws}&location=United%20Kingdom"))
     links.append(("Indeed (UK) – keywords", f"https://uk.indeed.com/jobs?q={kws}&l=United+Kingdom"))
-    return links
+    return tuple(links)
+
+ITEM_TMPL = """
+<hr>
+<h3>🔎 {title} – {org}</h3>
+<p><strong>Source:</strong> {source}<br>
+<strong>Location:</strong> {location}<br>
+<strong>Deadline:</strong> {deadline}<br>
+<strong>Keywords matched:</strong> {keywords}<br>
+<a href="{link}">View listing</a></p>
+""".format
 
 def build_html_email(items: list[Item], week_label: str, cfg: Config) -> tuple[str, str]:
     quick_links = build_quick_links(cfg)
-    parts = []
-    parts.append(f"""
+    esc = html.escape
+    sio = io.StringIO()
+    sio.write(f"""
 <h2>🎓 Weekly Opportunities</h2>
 <p>Hi Benja,</p>
 <p>Here are this week’s new <b>PhD, RA, and industry</b> roles in neuro/brain imaging (UK focus{", prioritising London" if cfg.prefer_london else ""}):</p>
 """)
-    total = 0
-    for it in items:
-        total += 1
-        parts.append(f"""
-<hr>
-<h3>🔎 {html.escape(it.title)} – {html.escape(it.org)}</h3>
-<p><strong>Source:</strong> {html.escape(it.source)}<br>
-<strong>Location:</strong> {html.escape(it.location)}<br>
-<strong>Deadline:</strong> {html.escape(it.deadline)}<br>
-<strong>Keywords matched:</strong> {", ".join(html.escape(k) for k in sorted(set(it.matched_keywords)))}<br>
-<a href="{html.escape(it.link)}">View listing</a></p>
-""")
+    total = len(items)
+    sio.writelines(
+        ITEM_TMPL(
+            title=esc(it.title),
+            org=esc(it.org),
+            source=esc(it.source),
+            location=esc(it.location),
+            deadline=esc(it.deadline),
+            keywords=", ".join(esc(k) for k in sorted(set(it.matched_keywords))),
+            link=esc(it.link),
+        )
+        for it in items
+    )
     if total == 0:
-        parts.append("<p><i>No matching listings found this week via automated scraping.</i></p>")
-    london_hits = sum(1 for it in items if "london" in (it.location or "").lower())
-    parts.append(f"""
+        sio.write("<p><i>No matching listings found this week via automated scraping.</i></p>\n")
+    london_hits = sum(london_bias_score(it.location) for it in items)
+    sio.write(f"""
 <hr>
 <p><b>Summary</b><br>
 - {total} opportunities this week<br>
 - {london_hits} in London</p>
 """)
-    parts.append("<hr><h3>🧭 One-click searches</h3><ul>")
-    for label, url in quick_links:
-        parts.append(f'<li><a href="{html.escape(url)}">{html.escape(label)}</a></li>')
-    parts.append("</ul><p>Best,<br>Your Weekly Opportunity Finder</p>")
+    sio.write("<hr><h3>🧭 One-click searches</h3><ul>\n")
+    sio.writelines(f'<li><a href="{esc(url)}">{esc(label)}</a></li>\n' for label, url in quick_links)
+    sio.write("</ul><p>Best,<br>Your Weekly Opportunity Finder</p>")
     subject = f"🎓 Weekly Opportunities in Neuro/Brain Imaging – {week_label}"
-    return subject, "\n".join(parts)
+    return subject, sio.getvalue()
 
 # ------------------------- send -------------------------
 
@@ -413,6 +534,8 @@ def send_email(subject: str, html_body: str, cfg: Config):
 
 def main():
     cfg = load_config()
+    # expired responses stay in the SQLite file until explicitly purged
+    SESSION.cache.delete(expired=True)
     now_utc = datetime.now(timezone.utc)
     wl = week_label_london(now_utc)
     items = gather_results(cfg)